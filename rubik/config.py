@@ -6,16 +6,17 @@ YELLOW = '🟨'
 WHITE = '⬜'
 BLACK = '⬛'
 
+# Colors are stored by their index here, BLACK standing for no color
+COLORS = (BLACK, RED, GREEN, BLUE, ORANGE, YELLOW, WHITE)
+COLOR_CODES = {color: code for code, color in enumerate(COLORS)}
+
 FRONT = 'front'
 BACK = 'back'
 UP = 'up'
 DOWN = 'down'
 LEFT = 'left'
 RIGHT = 'right'
-
-x = 'x'
-y = 'y'
-z = 'z'
+SIDES = (FRONT, BACK, UP, DOWN, LEFT, RIGHT)
 
 CLI = 'cli'
 GUI = 'gui'
\ No newline at end of file
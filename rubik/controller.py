@@ -1,3 +1,4 @@
+import functools
 import logging
 
 import config
@@ -12,6 +13,9 @@ class Controller:
         """Initializator."""
         assert interface in (config.CLI, config.GUI)
         self._cube = Rubik(size)
+        self._move_map = {name + suffix: getattr(self._cube, name + suffix)
+                          for name in self._cube.MOVES
+                          for suffix in ('', 'i', '2')}
         if interface == config.CLI:
             self._view = Cli(self._cube)
         elif interface == config.GUI:
@@ -32,21 +36,25 @@ class Controller:
     
     def apply_notation(self, notation):
         """Apply a string defined notation."""
-        for move in notation.split():
-            getattr(self._cube, move)()
+        self._cube.apply_table(self._cube.compose_notation(notation))
     
+    @functools.cached_property
+    def _chess_pattern_table(self):
+        """Move table of the chess pattern, composed on first use."""
+        return self._cube.compose_notation('R2 L2 B2 F2 U2 D2')
+
     def chess_pattern(self):
         """Apply a chess pattern."""
-        self.apply_notation('R2 L2 B2 F2 U2 D2')
+        self._cube.apply_table(self._chess_pattern_table)
 
     def make_move_callback(self, move):
         """Callback for making a move."""
-        try:
-            self._logger.info(f'Calling instruction: {move}')
-            getattr(self._cube, move)()
-        except AttributeError:
+        self._logger.info(f'Calling instruction: {move}')
+        make_move = self._move_map.get(move)
+        if make_move is None:
             self._logger.error(f'Invalid instruction: {move}')
             return False
+        make_move()
         return True
 
     def exit_callback(self):
@@ -1,109 +1,144 @@
+import numpy as np
+
 import config
 
 
-class Position(tuple):
+class Rubik:
+    """Represent a Rubik cube."""
 
-    ATTR_MAP = {
-        'x': 0,
-        'y': 1,
-        'z': 2
+    # Quarter turns of the layer (as in np.rot90) for each rotation direction
+    # and the order in which the piece colors are swapped.
+    ROTATIONS = {
+        (1, 0, 0): (-1, (0, 2, 1)),
+        (-1, 0, 0): (1, (0, 2, 1)),
+        (0, 1, 0): (1, (2, 1, 0)),
+        (0, -1, 0): (-1, (2, 1, 0)),
+        (0, 0, 1): (-1, (1, 0, 2)),
+        (0, 0, -1): (1, (1, 0, 2)),
     }
 
-    def __getattr__(self, attr):
-        """Allow reading with x, y, z as arguments."""
-        return self[self.ATTR_MAP[attr]]
-
-
-class Piece:
-    """Represent a Rubik cube piece."""
-
-    def __init__(self, colors):
-        """Initializator."""
-        self.x, self.y, self.z = colors
-    
-    def __repr__(self):
-        """Representation of the piece."""
-        return f"{self.x}, {self.y}, {self.z}"
-
-    def rotate(self, axis):
-        """Rotate a piece around axis."""
-        if axis == config.x:
-            self.x, self.y, self.z = self.x, self.z, self.y
-        elif axis == config.y:
-            self.x, self.y, self.z = self.z, self.y, self.x
-        elif axis == config.z:
-            self.x, self.y, self.z = self.y, self.x, self.z
-
-
-class Rubik:
-    """Represent a Rubik cube."""
+    # Signed rotation axis of each basic move.
+    MOVES = {
+        'R': (1, 0, 0),
+        'L': (-1, 0, 0),
+        'F': (0, 0, 1),
+        'B': (0, 0, -1),
+        'U': (0, 1, 0),
+        'D': (0, -1, 0),
+    }
 
     def __init__(self, size):
         """Initializator."""
+        assert size % 2 == 1
         self._size = size
         self._coord_limit = self._size // 2
-        self._pieces = {}
+        self._positions = None
+        self._colors = None
+        self._buffer = None
+        self._move_tables = {}
         self._generate_init_pieces()
+        self._generate_move_tables()
 
     def __getitem__(self, position):
-        """Get the piece at given position."""
-        return self.pieces[position]
-
-    def _get_init_piece_color(self, position):
-        """Get initial piece color based on its position."""
-        color_x, color_y, color_z = None, None, None
-        # x - orange/red
-        if position.x == self.coord_limit:
-            color_x = config.ORANGE
-        elif position.x == -self.coord_limit:
-            color_x = config.RED
-        # y - yellow/white
-        if position.y == self.coord_limit:
-            color_y = config.YELLOW
-        elif position.y == -self.coord_limit:
-            color_y = config.WHITE
-        # z - green/blue
-        if position.z == self.coord_limit:
-            color_z = config.GREEN
-        elif position.z == -self.coord_limit:
-            color_z = config.BLUE
-        return color_x, color_y, color_z
+        """Get the color codes of the piece at given position."""
+        x, y, z = position
+        limit = self.coord_limit
+        if not all(-limit <= coord <= limit for coord in position):
+            raise KeyError(position)
+        return self._colors[x + limit, y + limit, z + limit]
+
+    def _get_init_piece_colors(self, positions):
+        """Get initial piece color codes based on their positions."""
+        x, y, z = positions.T
+        limit = self.coord_limit
+        codes = config.COLOR_CODES
+        no_color = codes[config.BLACK]
+        return np.stack((
+            # x - orange/red
+            np.where(x == limit, codes[config.ORANGE],
+                     np.where(x == -limit, codes[config.RED], no_color)),
+            # y - yellow/white
+            np.where(y == limit, codes[config.YELLOW],
+                     np.where(y == -limit, codes[config.WHITE], no_color)),
+            # z - green/blue
+            np.where(z == limit, codes[config.GREEN],
+                     np.where(z == -limit, codes[config.BLUE], no_color)),
+        ), axis=-1).astype(np.int8)
 
     def _generate_init_pieces(self):
         """Generate pieces at their initial position."""
-        coordinate_range = range(-self.coord_limit, self.coord_limit + 1)
-        for x in coordinate_range:
-            for y in coordinate_range:
-                for z in coordinate_range:
-                    position = Position((x, y, z))
-                    self._pieces[position] = Piece(self._get_init_piece_color(position))
-
-    def _make_rotation(self, rotation, inverse=False):
-        """Make a rotation on a signed axis."""
-        axis = (config.x, config.y, config.z)[list(map(abs, rotation)).index(1)]
-        sign = sum(rotation)
-        new_pieces = {}
-        for position, piece in self.pieces.items():
-            if getattr(position, axis) == sign * self.coord_limit:
-                x, y, z = position
-                direction = tuple(map(lambda x: x * (-1)**inverse, rotation))
-                if direction == (1, 0, 0):
-                    new_position = Position((x, z, -y))
-                elif direction == (-1, 0, 0):
-                    new_position = Position((x, -z, y))
-                elif direction == (0, 1, 0):
-                    new_position = Position((-z, y, x))
-                elif direction == (0, -1, 0):
-                    new_position = Position((z, y, -x))
-                elif direction == (0, 0, 1):
-                    new_position = Position((y, -x, z))
-                elif direction == (0, 0, -1):
-                    new_position = Position((-y, x, z))
-                new_pieces[new_position] = piece
-                piece.rotate(getattr(config, axis))
-                continue
-            new_pieces[position] = piece
-        self._pieces = new_pieces
+        limit = self.coord_limit
+        grid = np.mgrid[-limit:limit + 1, -limit:limit + 1, -limit:limit + 1]
+        self._positions = np.stack(grid, -1).reshape(-1, 3).astype(np.int8)
+        self._colors = self._get_init_piece_colors(self._positions).reshape(
+            self.size, self.size, self.size, 3)
+        self._buffer = np.empty_like(self._colors)
+
+    def _make_rotation(self, colors, rotation, inverse=False):
+        """Rotate in place the layer on a signed axis of a colors grid."""
+        axis = int(np.argmax(np.abs(rotation)))
+        layer = sum(rotation) * self.coord_limit + self.coord_limit
+        direction = tuple(-value if inverse else value for value in rotation)
+        turns, order = self.ROTATIONS[direction]
+        index = [slice(None)] * 3
+        index[axis] = layer
+        face = colors[tuple(index)]
+        face[...] = np.rot90(face, turns)[..., order]
+
+    def _generate_move_tables(self):
+        """Precompute the sticker permutation of every move.
+
+        Each table holds, for every position and axis, the index of the
+        sticker (in the flattened colors) that ends up there after the move.
+        """
+        stickers = np.arange(self._colors.size).reshape(self._colors.shape)
+        for name, rotation in self.MOVES.items():
+            for suffix, inverse in (('', False), ('i', True)):
+                table = stickers.copy()
+                self._make_rotation(table, rotation, inverse)
+                self._move_tables[name + suffix] = table
+            table = self._move_tables[name]
+            self._move_tables[name + '2'] = self._compose(table, table)
+
+    @staticmethod
+    def _compose(first, second):
+        """Compose two move tables into one, applying first before second."""
+        return first.ravel()[second]
+
+    def compose_notation(self, notation):
+        """Compose the moves of a string defined notation into one move table."""
+        table = np.arange(self._colors.size).reshape(self._colors.shape)
+        for move in notation.split():
+            table = self._compose(table, self._move_tables[move])
+        return table
+
+    def apply_table(self, table):
+        """Apply a precomputed move table."""
+        np.take(self._colors, table, out=self._buffer)
+        self._colors[...] = self._buffer
+
+    def side_stickers(self, side):
+        """Get the face coordinates and flat sticker indices of a side.
+
+        Coordinates are (u, v) pairs in [-coord_limit, coord_limit], with u
+        growing to the right and v downwards when looking at the side.
+        """
+        x, y, z = self._positions.astype(np.intp).T
+        limit = self.coord_limit
+        if side == config.FRONT:
+            mask, axis, u, v = z == limit, 2, x, -y
+        elif side == config.BACK:
+            mask, axis, u, v = z == -limit, 2, -x, -y
+        elif side == config.UP:
+            mask, axis, u, v = y == limit, 1, x, z
+        elif side == config.DOWN:
+            mask, axis, u, v = y == -limit, 1, x, -z
+        elif side == config.LEFT:
+            mask, axis, u, v = x == -limit, 0, z, -y
+        elif side == config.RIGHT:
+            mask, axis, u, v = x == limit, 0, -z, -y
+        coordinates = np.stack((u[mask], v[mask]), axis=-1)
+        return coordinates, np.flatnonzero(mask) * 3 + axis
 
     @property
     def coord_limit(self):
@@ -116,42 +151,30 @@ class Rubik:
         return self._size
 
     @property
-    def pieces(self):
-        """Get the pieces of the cube."""
-        return self._pieces
-
-    def R(self): self._make_rotation((1, 0, 0))
-    def Ri(self): self._make_rotation((1, 0, 0), inverse=True)
-    def R2(self):
-        self.R()
-        self.R()
-
-    def L(self): self._make_rotation((-1, 0, 0))
-    def Li(self): self._make_rotation((-1, 0, 0), inverse=True)
-    def L2(self):
-        self.L()
-        self.L()
-
-    def F(self): self._make_rotation((0, 0, 1))
-    def Fi(self): self._make_rotation((0, 0, 1), inverse=True)
-    def F2(self):
-        self.F()
-        self.F()
-
-    def B(self): self._make_rotation((0, 0, -1))
-    def Bi(self): self._make_rotation((0, 0, -1), inverse=True)
-    def B2(self):
-        self.B()
-        self.B()
-
-    def U(self): self._make_rotation((0, 1, 0))
-    def Ui(self): self._make_rotation((0, 1, 0), inverse=True)
-    def U2(self):
-        self.U()
-        self.U()
-
-    def D(self): self._make_rotation((0, -1, 0))
-    def Di(self): self._make_rotation((0, -1, 0), inverse=True)
-    def D2(self):
-        self.D()
-        self.D()
+    def colors(self):
+        """Get the x, y, z color codes of the pieces as a (S, S, S, 3) grid."""
+        return self._colors
+
+    def R(self): self.apply_table(self._move_tables['R'])
+    def Ri(self): self.apply_table(self._move_tables['Ri'])
+    def R2(self): self.apply_table(self._move_tables['R2'])
+
+    def L(self): self.apply_table(self._move_tables['L'])
+    def Li(self): self.apply_table(self._move_tables['Li'])
+    def L2(self): self.apply_table(self._move_tables['L2'])
+
+    def F(self): self.apply_table(self._move_tables['F'])
+    def Fi(self): self.apply_table(self._move_tables['Fi'])
+    def F2(self): self.apply_table(self._move_tables['F2'])
+
+    def B(self): self.apply_table(self._move_tables['B'])
+    def Bi(self): self.apply_table(self._move_tables['Bi'])
+    def B2(self): self.apply_table(self._move_tables['B2'])
+
+    def U(self): self.apply_table(self._move_tables['U'])
+    def Ui(self): self.apply_table(self._move_tables['Ui'])
+    def U2(self): self.apply_table(self._move_tables['U2'])
+
+    def D(self): self.apply_table(self._move_tables['D'])
+    def Di(self): self.apply_table(self._move_tables['Di'])
+    def D2(self): self.apply_table(self._move_tables['D2'])
@@ -1,7 +1,11 @@
 import abc
+import ctypes
 import os
+import sys
 import tkinter as tk
 
+import numpy as np
+
 import config
 
 
@@ -21,75 +25,83 @@ class Interface(abc.ABC):
 class Cli(Interface):
     """Command line interface for a Rubik cube."""
 
+    TILES = np.array(config.COLORS)
+
+    # Move the cursor home and erase the display
+    CLEAR_SCREEN = '\x1b[H\x1b[2J'
+
+    def __init__(self, cube):
+        """Initializator."""
+        super().__init__(cube)
+        self._escape_sequences = self._enable_escape_sequences()
+        size = self._cube.size
+        self._face_origins = {
+            config.FRONT: (size, size),
+            config.BACK: (size, size * 3),
+            config.UP: (size, 0),
+            config.DOWN: (size, size * 2),
+            config.LEFT: (0, size),
+            config.RIGHT: (size * 2, size),
+        }
+        self._tile_map = None
+        self._generate_tile_map()
+
     def _get_piece_position_in_matrix(self, side, x, y):
         """Get piece position in the cross matrix."""
-        if side == config.FRONT:
-            start_x = self._cube.size
-            start_y = self._cube.size
-        if side == config.BACK:
-            start_x = self._cube.size
-            start_y = self._cube.size * 3
-        if side == config.UP:
-            start_x = self._cube.size
-            start_y = 0
-        if side == config.DOWN:
-            start_x = self._cube.size
-            start_y = self._cube.size * 2
-        if side == config.LEFT:
-            start_x = 0
-            start_y = self._cube.size
-        if side == config.RIGHT:
-            start_x = self._cube.size * 2
-            start_y = self._cube.size
+        start_x, start_y = self._face_origins[side]
         return (start_x + x + self._cube.coord_limit,
                 start_y + y + self._cube.coord_limit)
 
+    def _enable_escape_sequences(self):
+        """Enable escape sequences in the terminal and report if they work."""
+        if os.name != 'nt':
+            return True
+        # Turn on virtual terminal processing of the Windows console (Win10+)
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_ulong()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # 0x0004 is ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+
     def _clear_screen(self):
         """Clear terminal screen."""
-        if os.name == 'nt':
-            os.system('cls')
+        if self._escape_sequences:
+            sys.stdout.write(self.CLEAR_SCREEN)
+            sys.stdout.flush()
         else:
-            os.system('clear')
+            os.system('cls')
+
+    def _generate_tile_map(self):
+        """Map every visible sticker to its cell in the cross matrix."""
+        rows, cols, stickers = [], [], []
+        for side in config.SIDES:
+            coordinates, side_stickers = self._cube.side_stickers(side)
+            if side == config.BACK:
+                # The back is unfolded below the bottom, so it is upside down
+                coordinates = -coordinates
+            col, row = self._get_piece_position_in_matrix(side, *coordinates.T)
+            rows.append(row)
+            cols.append(col)
+            stickers.append(side_stickers)
+        self._tile_map = (np.concatenate(rows), np.concatenate(cols),
+                          np.concatenate(stickers))
 
     def refresh_cube(self):
         """Print the current state of the cube as a cross."""
         self._clear_screen()
 
-        # Init empty matrix to be printed
-        char_matrix = []
-        for _ in range(self._cube.size * 4):
-            char_matrix.append([])
-            for _ in range(self._cube.size * 3):
-                char_matrix[-1].append(config.BLACK)
-
-        # Populate color tiles in the matrix
-        for position, piece in self._cube.pieces.items():
-            x, y, z = position
-            if z == self._cube.coord_limit:
-                col, row = self._get_piece_position_in_matrix(config.FRONT, x, -y)
-                char_matrix[row][col] = piece.z
-            if z == -self._cube.coord_limit:
-                col, row = self._get_piece_position_in_matrix(config.BACK, x, y)
-                char_matrix[row][col] = piece.z
-            if y == self._cube.coord_limit:
-                col, row = self._get_piece_position_in_matrix(config.UP, x, z)
-                char_matrix[row][col] = piece.y
-            if y == -self._cube.coord_limit:
-                col, row = self._get_piece_position_in_matrix(config.DOWN, x, -z)
-                char_matrix[row][col] = piece.y
-            if x == -self._cube.coord_limit:
-                col, row = self._get_piece_position_in_matrix(config.LEFT, z, -y)
-                char_matrix[row][col] = piece.x
-            if x == self._cube.coord_limit:
-                col, row = self._get_piece_position_in_matrix(config.RIGHT, -z, -y)
-                char_matrix[row][col] = piece.x
+        # Populate color codes in an empty matrix and turn them into tiles
+        code_matrix = np.full((self._cube.size * 4, self._cube.size * 3),
+                              config.COLOR_CODES[config.BLACK], dtype=np.int8)
+        rows, cols, stickers = self._tile_map
+        code_matrix[rows, cols] = self._cube.colors.ravel()[stickers]
+        char_matrix = self.TILES[code_matrix]
 
         # Print the matrix
-        for row in char_matrix:
-            print('')
-            for col in row:
-                print(col, end='')
-        print('')
+        lines = char_matrix.view(f'U{char_matrix.shape[1]}').ravel()
+        sys.stdout.write('\n' + '\n'.join(lines) + '\n')
     
     def invalid_instruction(self):
         """Report an invalid isntruction."""
@@ -124,12 +136,12 @@ class Gui(Interface):
     BUTTON_FONT = 'sans 20 bold'
 
     COLOR_MAP = {
-        config.RED: 'red',
-        config.GREEN: 'green',
-        config.BLUE: 'blue',
-        config.ORANGE: 'orange',
-        config.YELLOW: 'yellow',
-        config.WHITE: 'white',
+        config.COLOR_CODES[config.RED]: 'red',
+        config.COLOR_CODES[config.GREEN]: 'green',
+        config.COLOR_CODES[config.BLUE]: 'blue',
+        config.COLOR_CODES[config.ORANGE]: 'orange',
+        config.COLOR_CODES[config.YELLOW]: 'yellow',
+        config.COLOR_CODES[config.WHITE]: 'white',
     }
 
     def __init__(self, cube):
@@ -137,12 +149,17 @@ class Gui(Interface):
         self._cube = cube
         self._window = None
         self._canvas = None
+        self._tile_ids = None
+        self._side_tiles = None
+        self._swipe_map = None
         self._last_tile = None
         self._make_move_cb = None
         self._side = config.FRONT
         self._init_window()
         self._init_canvas()
         self._init_controls()
+        self._generate_side_tiles()
+        self._generate_swipe_map()
 
     def _exit(self, callback):
         """Handle exit of window."""
@@ -163,6 +180,11 @@ class Gui(Interface):
         self._canvas.bind("<ButtonPress-1>", self._on_mouse_down)
         self._canvas.bind("<ButtonRelease-1>", self._on_mouse_up)
         self._canvas.pack()
+        self._tile_ids = [[self._canvas.create_rectangle(x * self.TILE_SIZE, y * self.TILE_SIZE,
+                                                         x * self.TILE_SIZE + self.TILE_SIZE,
+                                                         y * self.TILE_SIZE + self.TILE_SIZE)
+                           for y in range(self._cube.size)]
+                          for x in range(self._cube.size)]
     
     def _init_controls(self):
         """Initiate controls."""
@@ -179,23 +201,42 @@ class Gui(Interface):
         tk.Button(self._window, text="Right", font=self.BUTTON_FONT,
                   command=lambda: self._on_change_side(config.RIGHT)).pack(fill=tk.X)
 
+    def _generate_swipe_map(self):
+        """Map swipes along the edges of a side to moves."""
+        tiles = range(self._cube.size)
+        last = self._cube.size - 1
+        # Tiles along an edge in swipe direction and the move for each side
+        edges = (
+            ([(tile, 0) for tile in tiles], ('Ui', 'Ui', 'Bi', 'Fi', 'Ui', 'Ui')),
+            ([(tile, 0) for tile in reversed(tiles)], ('U', 'U', 'B', 'F', 'U', 'U')),
+            ([(0, tile) for tile in tiles], ('L', 'L', 'L', 'L', 'B', 'F')),
+            ([(0, tile) for tile in reversed(tiles)], ('Li', 'Li', 'Li', 'Li', 'Bi', 'Fi')),
+            ([(tile, last) for tile in tiles], ('D', 'D', 'F', 'B', 'D', 'D')),
+            ([(tile, last) for tile in reversed(tiles)], ('Di', 'Di', 'Fi', 'Bi', 'Di', 'Di')),
+            ([(last, tile) for tile in tiles], ('Ri', 'Li', 'Ri', 'Ri', 'Fi', 'Bi')),
+            ([(last, tile) for tile in reversed(tiles)], ('R', 'L', 'R', 'R', 'F', 'B')),
+        )
+        self._swipe_map = {}
+        for edge, moves in edges:
+            for index, from_tile in enumerate(edge):
+                for to_tile in edge[index + 1:]:
+                    for side, move in zip(config.SIDES, moves):
+                        self._swipe_map[(from_tile, to_tile, side)] = move
+
     def _get_tile_at_position(self, x, y):
         """Get a tile tuple at certain position."""
-        for tile_x in range(self._cube.size):
-            for tile_y in range(self._cube.size):
-                if (tile_x * self.TILE_SIZE < x < tile_x * self.TILE_SIZE + self.TILE_SIZE and 
-                    tile_y * self.TILE_SIZE < y < tile_y * self.TILE_SIZE + self.TILE_SIZE):
-                    return (tile_x, tile_y)
+        tile_x, tile_y = x // self.TILE_SIZE, y // self.TILE_SIZE
+        if 0 <= tile_x < self._cube.size and 0 <= tile_y < self._cube.size:
+            return (tile_x, tile_y)
+        return None
 
     def _on_mouse_down(self, event):
         """Handle mouse down event."""
         self._last_tile = self._get_tile_at_position(event.x, event.y)
 
-    def _on_mouse_up_global(self, _):
+    def _on_mouse_up_global(self, event):
         """Handle mouse up event."""
-        x, y = self._window.winfo_pointerxy()
-        target = self._window.winfo_containing(x, y)
-        if target and target is not self._canvas:
+        if event.widget is not self._canvas:
             self._last_tile = None
 
     def _on_mouse_up(self, event):
@@ -203,74 +244,9 @@ class Gui(Interface):
         if self._last_tile is None:
             return
         this_tile = self._get_tile_at_position(event.x, event.y)
-        if (self._last_tile == (0, 0) and this_tile in [(1, 0), (2, 0)] or
-            self._last_tile == (1, 0) and this_tile == (2, 0)):
-            if self._side in (config.FRONT, config.BACK, config.LEFT, config.RIGHT):
-                self._make_move_cb('Ui')
-            if self._side in (config.UP, ):
-                self._make_move_cb('Bi')
-            if self._side in (config.DOWN, ):
-                self._make_move_cb('Fi')
-        elif (self._last_tile == (2, 0) and this_tile in [(1, 0), (0, 0)] or
-              self._last_tile == (1, 0) and this_tile == (0, 0)):
-            if self._side in (config.FRONT, config.BACK, config.LEFT, config.RIGHT):
-                self._make_move_cb('U')
-            if self._side in (config.UP, ):
-                self._make_move_cb('B')
-            if self._side in (config.DOWN, ):
-                self._make_move_cb('F')
-        elif (self._last_tile == (0, 0) and this_tile in [(0, 1), (0, 2)] or
-              self._last_tile == (0, 1) and this_tile == (0, 2)):
-            if self._side in (config.FRONT, config.UP, config.BACK, config.DOWN):
-                self._make_move_cb('L')
-            if self._side in (config.LEFT, ):
-                self._make_move_cb('B')
-            if self._side in (config.RIGHT, ):
-                self._make_move_cb('F')
-        elif (self._last_tile == (0, 2) and this_tile in [(0, 1), (0, 0)] or
-              self._last_tile == (0, 1) and this_tile == (0, 0)):
-            if self._side in (config.FRONT, config.UP, config.BACK, config.DOWN):
-                self._make_move_cb('Li')
-            if self._side in (config.LEFT, ):
-                self._make_move_cb('Bi')
-            if self._side in (config.RIGHT, ):
-                self._make_move_cb('Fi')
-        elif (self._last_tile == (0, 2) and this_tile in [(1, 2), (2, 2)] or
-              self._last_tile == (1, 2) and this_tile == (2, 2)):
-            if self._side in (config.FRONT, config.LEFT, config.RIGHT, config.BACK):
-                self._make_move_cb('D')
-            if self._side in (config.UP, ):
-                self._make_move_cb('F')
-            if self._side in (config.DOWN, ):
-                self._make_move_cb('B')
-        elif (self._last_tile == (2, 2) and this_tile in [(1, 2), (0, 2)] or
-              self._last_tile == (1, 2) and this_tile == (0, 2)):
-            if self._side in (config.FRONT, config.LEFT, config.RIGHT, config.BACK):
-                self._make_move_cb('Di')
-            if self._side in (config.UP, ):
-                self._make_move_cb('Fi')
-            if self._side in (config.DOWN, ):
-                self._make_move_cb('Bi')
-        elif (self._last_tile == (2, 0) and this_tile in [(2, 1), (2, 2)] or
-              self._last_tile == (2, 1) and this_tile == (2, 2)):
-            if self._side in (config.FRONT, config.UP, config.DOWN):
-                self._make_move_cb('Ri')
-            if self._side in (config.BACK, ):
-                self._make_move_cb('Li')
-            if self._side in (config.LEFT, ):
-                self._make_move_cb('Fi')
-            if self._side in (config.RIGHT, ):
-                self._make_move_cb('Bi')
-        elif (self._last_tile == (2, 2) and this_tile in [(2, 1), (2, 0)] or
-              self._last_tile == (2, 1) and this_tile == (2, o)):
-            if self._side in (config.FRONT, config.UP, config.DOWN):
-                self._make_move_cb('R')
-            if self._side in (config.BACK, ):
-                self._make_move_cb('L')
-            if self._side in (config.LEFT, ):
-                self._make_move_cb('F')
-            if self._side in (config.RIGHT, ):
-                self._make_move_cb('B')
+        move = self._swipe_map.get((self._last_tile, this_tile, self._side))
+        if move is not None:
+            self._make_move_cb(move)
         self.refresh_cube()
         self._last_tile = None
 
@@ -280,36 +256,21 @@ class Gui(Interface):
         self.refresh_cube()
 
     def _draw_rect(self, x, y, color):
-        """Draw a rectange at given position with given color."""
+        """Fill the rectangle at given position with given color."""
         x = x + self._cube.coord_limit
         y = y + self._cube.coord_limit
-        self._canvas.create_rectangle(x * self.TILE_SIZE, y * self.TILE_SIZE,
-                                      x * self.TILE_SIZE + self.TILE_SIZE,
-                                      y * self.TILE_SIZE + self.TILE_SIZE,
-                                      fill=color)
+        self._canvas.itemconfig(self._tile_ids[x][y], fill=color)
+
+    def _generate_side_tiles(self):
+        """Map the tiles of every side to the stickers shown on them."""
+        self._side_tiles = {side: self._cube.side_stickers(side) for side in config.SIDES}
 
     def refresh_cube(self):
         """Refresh the cube on screen."""
-        for position, piece in self._cube.pieces.items():
-            x, y, z = position
-            if self._side == config.FRONT and z == self._cube.coord_limit:
-                self._draw_rect(x, -y, self.COLOR_MAP[piece.z])
-                continue
-            if self._side == config.BACK and z == -self._cube.coord_limit:
-                self._draw_rect(-x, -y, self.COLOR_MAP[piece.z])
-                continue
-            if self._side == config.UP and y == self._cube.coord_limit:
-                self._draw_rect(x, z, self.COLOR_MAP[piece.y])
-                continue
-            if self._side == config.DOWN and y == -self._cube.coord_limit:
-                self._draw_rect(x, -z, self.COLOR_MAP[piece.y])
-                continue
-            if self._side == config.LEFT and x == -self._cube.coord_limit:
-                self._draw_rect(z, -y, self.COLOR_MAP[piece.x])
-                continue
-            if self._side == config.RIGHT and x == self._cube.coord_limit:
-                self._draw_rect(-z, -y, self.COLOR_MAP[piece.x])
-                continue
+        coordinates, stickers = self._side_tiles[self._side]
+        colors = self._cube.colors.ravel()[stickers].tolist()
+        for (x, y), color in zip(coordinates.tolist(), colors):
+            self._draw_rect(x, y, self.COLOR_MAP[color])
 
     def start(self, make_move, exit):
         """Start interactive mode, allowing the user to make moves."""